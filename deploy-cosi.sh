@@ -416,18 +416,22 @@ deploy_cosi_sample_app() {
     # Create temp files with indented content
     sed 's/^/    /' "$SCRIPT_DIR/manifests/sample-apps/python-cosi-test/test_cosi_s3.py" > /tmp/python_cosi_indented.tmp
     sed 's/^/    /' "$SCRIPT_DIR/manifests/sample-apps/python-cosi-test/requirements.txt" > /tmp/requirements_cosi_indented.tmp
+    sed 's/^/    /' "$SCRIPT_DIR/manifests/sample-apps/python-s3-testkit/s3_testkit.py" > /tmp/testkit_cosi_indented.tmp
 
     # Use sed to replace placeholders with file contents (works on both macOS and Linux)
     sed -e '/PYTHON_SCRIPT_CONTENT/{
         r /tmp/python_cosi_indented.tmp
         d
+    }' -e '/TESTKIT_CONTENT/{
+        r /tmp/testkit_cosi_indented.tmp
+        d
     }' -e '/REQUIREMENTS_CONTENT/{
         r /tmp/requirements_cosi_indented.tmp
         d
     }' /tmp/cosi-s3-test-configmap-temp.yaml > /tmp/cosi-s3-test-configmap.yaml
 
     # Clean up temp files
-    rm -f /tmp/python_cosi_indented.tmp /tmp/requirements_cosi_indented.tmp
+    rm -f /tmp/python_cosi_indented.tmp /tmp/testkit_cosi_indented.tmp /tmp/requirements_cosi_indented.tmp
 
     kubectl apply -f /tmp/cosi-s3-test-configmap.yaml
 
@@ -417,18 +417,22 @@ deploy_sample_app() {
     # Create temp files with indented content
     sed 's/^/    /' "$SCRIPT_DIR/manifests/sample-apps/python-s3-test/test_s3.py" > /tmp/python_indented.tmp
     sed 's/^/    /' "$SCRIPT_DIR/manifests/sample-apps/python-s3-test/requirements.txt" > /tmp/requirements_indented.tmp
+    sed 's/^/    /' "$SCRIPT_DIR/manifests/sample-apps/python-s3-testkit/s3_testkit.py" > /tmp/testkit_indented.tmp
 
     # Use sed to replace placeholders with file contents (works on both macOS and Linux)
     sed -e '/PYTHON_SCRIPT_CONTENT/{
         r /tmp/python_indented.tmp
         d
+    }' -e '/TESTKIT_CONTENT/{
+        r /tmp/testkit_indented.tmp
+        d
     }' -e '/REQUIREMENTS_CONTENT/{
         r /tmp/requirements_indented.tmp
         d
     }' /tmp/s3-test-configmap-temp.yaml > /tmp/s3-test-configmap.yaml
 
     # Clean up temp files
-    rm -f /tmp/python_indented.tmp /tmp/requirements_indented.tmp
+    rm -f /tmp/python_indented.tmp /tmp/testkit_indented.tmp /tmp/requirements_indented.tmp
 
     kubectl apply -f /tmp/s3-test-configmap.yaml
 
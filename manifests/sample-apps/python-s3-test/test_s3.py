@@ -1,20 +1,28 @@
 #!/usr/bin/env python3
 """
 S3 Test Script for Rook Ceph Object Store
-Tests basic S3 operations using boto3
+Tests basic S3 operations using the shared s3_testkit module
 """
 
+import asyncio
+import logging
 import os
 import sys
-import boto3
-from botocore.exceptions import ClientError
-import urllib3
 
-# Disable SSL warnings when using self-signed certificates
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+from botocore.exceptions import BotoCoreError, ClientError
+
+import s3_testkit
+
+
+# Number of objects uploaded, verified and deleted concurrently
+BATCH_SIZE = int(os.getenv("S3_TEST_BATCH_SIZE", "16"))
+
+logger = logging.getLogger('s3-test')
 
 
 def main():
+    s3_testkit.configure_logging()
+
     # Get credentials from environment
     endpoint = os.getenv("S3_ENDPOINT")
     access_key = os.getenv("S3_ACCESS_KEY")
@@ -22,97 +30,64 @@ def main():
     use_tls = os.getenv("S3_USE_TLS", "false").lower() == "true"
 
     if not all([endpoint, access_key, secret_key]):
-        print("✗ Missing required environment variables")
-        print("  Required: S3_ENDPOINT, S3_ACCESS_KEY, S3_SECRET_KEY")
+        logger.error("✗ Missing required environment variables")
+        logger.info("  Required: S3_ENDPOINT, S3_ACCESS_KEY, S3_SECRET_KEY")
         sys.exit(1)
 
-    print(f"Connecting to S3 endpoint: {endpoint}")
-    print(f"TLS enabled: {use_tls}")
+    logger.info(f"Connecting to S3 endpoint: {endpoint}")
+    logger.info(f"TLS enabled: {use_tls}")
 
     # Create S3 client
     try:
-        s3_client = boto3.client(
-            's3',
-            endpoint_url=endpoint,
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            region_name='us-east-1',
-            use_ssl=use_tls,
-            verify=False  # Skip certificate verification for self-signed certs
-        )
+        s3_client = s3_testkit.make_client(endpoint, access_key, secret_key, use_ssl=use_tls)
     except Exception as e:
-        print(f"✗ Failed to create S3 client: {e}")
+        logger.error(f"✗ Failed to create S3 client: {e}")
         sys.exit(1)
 
     bucket_name = "test-bucket"
 
     # Create bucket
-    print(f"Creating bucket: {bucket_name}")
+    logger.info(f"Creating bucket: {bucket_name}")
     try:
         s3_client.create_bucket(Bucket=bucket_name)
-        print("✓ Bucket created successfully!")
+        logger.info("✓ Bucket created successfully!")
     except ClientError as e:
         if e.response['Error']['Code'] == 'BucketAlreadyOwnedByYou':
-            print("✓ Bucket already exists (owned by you)")
+            logger.info("✓ Bucket already exists (owned by you)")
         else:
-            print(f"✗ Failed to create bucket: {e}")
+            logger.error(f"✗ Failed to create bucket: {e}")
             sys.exit(1)
-
-    # Upload a test file
-    print("Uploading test file...")
-    test_content = "Hello from Rook Ceph Object Store!"
-    try:
-        s3_client.put_object(
-            Bucket=bucket_name,
-            Key="test.txt",
-            Body=test_content.encode('utf-8')
-        )
-        print("✓ File uploaded successfully!")
-    except ClientError as e:
-        print(f"✗ Failed to upload file: {e}")
+    except BotoCoreError as e:
+        logger.error(f"✗ Failed to create bucket: {e}")
         sys.exit(1)
 
     # List buckets
-    print("\nListing all buckets:")
+    logger.info("\nListing all buckets:")
     try:
         response = s3_client.list_buckets()
         for bucket in response.get('Buckets', []):
-            print(f"  - {bucket['Name']}")
+            logger.info(f"  - {bucket['Name']}")
     except ClientError as e:
-        print(f"✗ Failed to list buckets: {e}")
+        logger.error(f"✗ Failed to list buckets: {e}")
         sys.exit(1)
 
-    # List objects in bucket
-    print(f"\nListing objects in {bucket_name}:")
-    try:
-        response = s3_client.list_objects_v2(Bucket=bucket_name)
-        for obj in response.get('Contents', []):
-            print(f"  - {obj['Key']} ({obj['Size']} bytes)")
-    except ClientError as e:
-        print(f"✗ Failed to list objects: {e}")
+    # Run tests, then the same operations concurrently across many keys
+    if not s3_testkit.run_suite(s3_client, bucket_name, keys=["test.txt"]):
         sys.exit(1)
-
-    # Download and verify
-    print("\nDownloading and verifying file...")
-    try:
-        response = s3_client.get_object(Bucket=bucket_name, Key="test.txt")
-        content = response['Body'].read().decode('utf-8')
-        print(f"Content: {content}")
-
-        if content == test_content:
-            print("✓ Content verified successfully!")
-        else:
-            print("✗ Content verification failed!")
-            print(f"  Expected: {test_content}")
-            print(f"  Got: {content}")
-            sys.exit(1)
-    except ClientError as e:
-        print(f"✗ Failed to download file: {e}")
+    if not asyncio.run(s3_testkit.run_batch(
+        endpoint,
+        access_key,
+        secret_key,
+        bucket_name,
+        [f"batch/test-{i}.txt" for i in range(BATCH_SIZE)],
+        use_ssl=use_tls
+    )):
         sys.exit(1)
 
-    print("\n" + "=" * 50)
-    print("All S3 operations completed successfully!")
-    print("=" * 50)
+    logger.info("\n" + "=" * 50)
+    logger.info("All S3 operations completed successfully!")
+    logger.info("=" * 50)
+    logging.shutdown()
 
 
 if __name__ == "__main__":
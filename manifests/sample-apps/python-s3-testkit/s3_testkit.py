@@ -0,0 +1,642 @@
+#!/usr/bin/env python3
+"""
+Shared S3 Test Kit
+
+Client construction, logging setup and the S3 test suite shared by the
+object store (test_s3.py) and COSI (test_cosi_s3.py) sample applications.
+The deploy scripts ship this file next to each entrypoint in its ConfigMap.
+
+boto3, aioboto3 and orjson are imported inside the functions that need them,
+so importing this module stays cheap until a client is actually created.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import base64
+import functools
+import hashlib
+import io
+import logging
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+
+# Client settings shared by the sync (Config) and async (AioConfig) clients:
+# path-style addressing (required for Ceph RGW), a connection pool large enough
+# for concurrent requests, TCP keep-alive, and adaptive retries for 503 SlowDown.
+# Short timeouts release sockets quickly when RGW stops responding instead of
+# holding them for botocore's 60 second defaults.
+CLIENT_CONFIG = {
+    'signature_version': 's3v4',
+    's3': {'addressing_style': 'path'},
+    'max_pool_connections': 64,
+    'tcp_keepalive': True,
+    'retries': {'mode': 'adaptive', 'max_attempts': 5},
+    'connect_timeout': 3,
+    'read_timeout': 10,
+}
+
+# Worker threads used to issue independent sync requests in parallel;
+# kept at or below max_pool_connections so no worker waits for a connection
+BATCH_WORKERS = 32
+
+# Objects above 8 MiB are uploaded and downloaded as parallel 8 MiB parts
+MB = 1024 * 1024
+MULTIPART_THRESHOLD = 8 * MB
+MULTIPART_CHUNKSIZE = 8 * MB
+MAX_TRANSFER_CONCURRENCY = 16
+
+# Downloads are hashed in chunks of this size instead of being read into memory
+CHUNK_SIZE = 1024 * 1024
+
+# Default test payload, encoded once so repeated uploads share the same bytes object
+TEST_CONTENT = "Hello from Rook Ceph Object Store!"
+TEST_BODY = TEST_CONTENT.encode('utf-8')
+
+# Maximum number of objects shown by the listing sanity check
+LIST_MAX_ITEMS = 10
+
+# DeleteObjects accepts at most 1000 keys per request
+DELETE_BATCH_SIZE = 1000
+
+# Location of the COSI secret inside the pod, as per the COSI specification
+COSI_BUCKET_INFO_PATH = "/data/cosi/BucketInfo"
+
+logger = logging.getLogger('s3-testkit')
+
+# S3 clients created by make_client(), keyed by their connection arguments
+_CLIENTS = {}
+
+# Client operations with the Bucket argument already bound, see bind_bucket_operations()
+BucketOperations = namedtuple(
+    'BucketOperations',
+    ['bucket_name', 'put', 'get', 'head', 'paginate', 'delete_objects']
+)
+
+
+class _BufferedStreamHandler(logging.StreamHandler):
+    """
+    StreamHandler that leaves batching to the stream's own buffer.
+
+    StreamHandler.emit flushes the stream after every record, which costs one
+    write per line even on a block-buffered stdout. This handler only writes
+    into the buffer and flushes for warnings and errors, so they show up
+    immediately; logging.shutdown() flushes whatever is left.
+    """
+
+    def emit(self, record):
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+            if record.levelno >= logging.WARNING:
+                self.stream.flush()
+        except Exception:
+            self.handleError(record)
+
+
+def configure_logging():
+    """
+    Send log records to stdout without flushing after every record.
+    When stdout is a pipe (as in the pod) it is block-buffered, so records
+    reach the file descriptor in batches; warnings and errors are flushed
+    immediately and logging.shutdown() flushes whatever is left.
+    """
+    stream_handler = _BufferedStreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter('%(message)s'))
+    logging.basicConfig(level=logging.INFO, handlers=[stream_handler])
+
+
+def load_cosi_bucket_info(bucket_info_path=COSI_BUCKET_INFO_PATH):
+    """
+    Load bucket information from the COSI secret mounted at bucket_info_path.
+    The BucketInfo file contains JSON with endpoint, credentials, and bucket name.
+    """
+    import orjson
+
+    logger.info(f"Loading COSI bucket information from {bucket_info_path}...")
+
+    try:
+        bucket_info = orjson.loads(Path(bucket_info_path).read_bytes())
+
+        logger.info("Successfully loaded bucket information:")
+        logger.info(orjson.dumps(bucket_info, option=orjson.OPT_INDENT_2).decode())
+
+        # Extract S3 credentials from the nested structure
+        # Expected format: {"spec": {"bucketName": "...", "secretS3": {...}}}
+        # or direct format: {"endpoint": "...", "accessKeyID": "...", ...}
+
+        if 'spec' in bucket_info:
+            # Newer COSI format with spec
+            spec = bucket_info['spec']
+            bucket_name = spec.get('bucketName', '')
+            secret_s3 = spec.get('secretS3', {})
+
+            endpoint = secret_s3.get('endpoint', '')
+            region = secret_s3.get('region', 'us-east-1')
+            access_key = secret_s3.get('accessKeyID', '')
+            secret_key = secret_s3.get('accessSecretKey', '')
+        else:
+            # Direct format
+            bucket_name = bucket_info.get('bucketName', '')
+            endpoint = bucket_info.get('endpoint', '')
+            region = bucket_info.get('region', 'us-east-1')
+            access_key = bucket_info.get('accessKeyID', '')
+            secret_key = bucket_info.get('accessSecretKey', '')
+
+        return {
+            'bucket_name': bucket_name,
+            'endpoint': endpoint,
+            'region': region,
+            'access_key': access_key,
+            'secret_key': secret_key
+        }
+
+    except FileNotFoundError:
+        logger.error(f"ERROR: COSI BucketInfo file not found at {bucket_info_path}")
+        logger.info("Make sure the COSI secret is properly mounted to the pod")
+        sys.exit(1)
+    except orjson.JSONDecodeError as e:
+        logger.error(f"ERROR: Failed to parse BucketInfo JSON: {e}")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"ERROR: Unexpected error loading bucket info: {e}")
+        sys.exit(1)
+
+
+def make_client(endpoint, access_key, secret_key, region='us-east-1', use_ssl=True):
+    """
+    Create and configure a boto3 S3 client, shared by callers passing the same arguments.
+
+    The credentials are set directly on a single botocore session, so botocore
+    never walks its default provider chain (environment, config files, instance
+    metadata). Subsequent calls with the same arguments return the same client.
+    """
+    client_key = (endpoint, access_key, secret_key, region, use_ssl)
+    if client_key in _CLIENTS:
+        return _CLIENTS[client_key]
+
+    import boto3
+    import botocore.session
+    import urllib3
+    from botocore.client import Config
+
+    # Disable SSL warnings when using self-signed certificates
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+    botocore_session = botocore.session.get_session()
+    botocore_session.set_credentials(access_key, secret_key)
+
+    s3 = boto3.Session(botocore_session=botocore_session).client(
+        's3',
+        endpoint_url=endpoint,
+        region_name=region,
+        use_ssl=use_ssl,
+        config=Config(**CLIENT_CONFIG),
+        verify=False  # Skip SSL verification for self-signed certs
+    )
+    # Close pooled connections on exit rather than leaving them to the OS
+    atexit.register(s3._endpoint.http_session.close)
+    _CLIENTS[client_key] = s3
+    return s3
+
+
+@functools.lru_cache(maxsize=1)
+def _transfer_config():
+    """
+    Return the TransferConfig used for multipart uploads and downloads.
+    """
+    from boto3.s3.transfer import TransferConfig
+
+    return TransferConfig(
+        multipart_threshold=MULTIPART_THRESHOLD,
+        multipart_chunksize=MULTIPART_CHUNKSIZE,
+        max_concurrency=MAX_TRANSFER_CONCURRENCY,
+        use_threads=True
+    )
+
+
+def bind_bucket_operations(s3, bucket_name):
+    """
+    Bind the client operations used by the tests to one bucket.
+
+    Resolving each method on the client once and pre-filling Bucket with
+    functools.partial avoids repeating the client attribute lookup and the
+    Bucket keyword on every call. Works for both boto3 and aioboto3 clients.
+    """
+    return BucketOperations(
+        bucket_name=bucket_name,
+        put=functools.partial(s3.put_object, Bucket=bucket_name),
+        get=functools.partial(s3.get_object, Bucket=bucket_name),
+        head=functools.partial(s3.head_object, Bucket=bucket_name),
+        paginate=functools.partial(s3.get_paginator('list_objects_v2').paginate, Bucket=bucket_name),
+        delete_objects=functools.partial(s3.delete_objects, Bucket=bucket_name)
+    )
+
+
+def _content_md5(body):
+    """
+    Return the base64-encoded MD5 digest of body for the Content-MD5 header.
+    Callers compute it once per payload and reuse it for every key.
+    """
+    return base64.b64encode(hashlib.md5(body, usedforsecurity=False).digest()).decode('ascii')
+
+
+def warm_up(s3):
+    """
+    Issue one cheap request so DNS resolution, the TCP/TLS handshake and the
+    request signer are set up before the tests run. Errors are ignored since
+    the credentials may not be allowed to list buckets, and connection errors
+    surface again on the first real request.
+    """
+    try:
+        s3.list_buckets()
+    except (BotoCoreError, ClientError):
+        pass
+
+
+class _DigestWriter:
+    """
+    Write-only file object for downloads that keeps a SHA-256 digest
+    and byte count of the data instead of the data itself.
+    """
+
+    def __init__(self):
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self.sha256.update(data)
+        self.size += len(data)
+        return len(data)
+
+
+def _batch(fn, items, workers=BATCH_WORKERS):
+    """
+    Call fn on every item from a thread pool and return the results in order.
+    boto3 clients are thread-safe and release the GIL while waiting on the
+    socket, so independent requests overlap instead of running back to back.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(fn, items))
+
+
+def _delete_batches(keys):
+    """
+    Yield DeleteObjects payloads of at most DELETE_BATCH_SIZE keys each.
+    Quiet mode makes the response list only the keys that failed.
+    """
+    for i in range(0, len(keys), DELETE_BATCH_SIZE):
+        yield {
+            'Objects': [{'Key': key} for key in keys[i:i + DELETE_BATCH_SIZE]],
+            'Quiet': True
+        }
+
+
+def bulk_delete(delete_objects, keys):
+    """
+    Delete keys with one DeleteObjects request per DELETE_BATCH_SIZE keys,
+    using a bucket-bound delete_objects from bind_bucket_operations().
+    Returns the per-key errors reported by the server.
+    """
+    errors = []
+    for delete in _delete_batches(keys):
+        response = delete_objects(Delete=delete)
+        errors.extend(response.get('Errors', []))
+    return errors
+
+
+def _object_exists(head, key):
+    """
+    Return False if the bucket-bound head_object reports the key as not found,
+    True otherwise.
+    """
+    try:
+        head(Key=key)
+    except ClientError as e:
+        if e.response['Error']['Code'] in ('404', 'NoSuchKey'):
+            return False
+        raise
+    return True
+
+
+def _upload(s3, ops, key, body, body_md5):
+    """
+    Upload body to key. Bodies below the multipart threshold are sent as one
+    put_object instead of going through the transfer manager, with the
+    precomputed body_md5 as Content-MD5 so RGW rejects a corrupted body;
+    larger bodies are uploaded in parts.
+    Either way, server errors are raised as ClientError and connection errors
+    as BotoCoreError.
+    """
+    if len(body) < MULTIPART_THRESHOLD:
+        return ops.put(
+            Key=key,
+            Body=body,
+            ContentMD5=body_md5
+        )
+    from boto3.exceptions import S3UploadFailedError
+
+    try:
+        return s3.upload_fileobj(io.BytesIO(body), ops.bucket_name, key, Config=_transfer_config())
+    except S3UploadFailedError as e:
+        # The transfer manager wraps the server's ClientError; unwrap it so
+        # callers can inspect the error code (e.g. NoSuchBucket) as for put_object
+        cause = e.__cause__ or e.__context__
+        if isinstance(cause, (BotoCoreError, ClientError)):
+            raise cause from None
+        raise
+
+
+def run_suite(s3, bucket_name, keys=None, body=TEST_BODY):
+    """
+    Test basic S3 operations on an existing bucket.
+
+    Every key is uploaded in parallel and deleted in bulk; the download and
+    metadata checks run against the first key. Returns True if every test passed.
+    """
+    ops = bind_bucket_operations(s3, bucket_name)
+
+    logger.info(f"\n{'='*60}")
+    logger.info(f"Testing S3 Operations on Bucket '{bucket_name}'")
+    logger.info(f"{'='*60}")
+
+    # Test 1: Upload the objects
+    # There is no separate head_bucket check: a missing bucket surfaces here
+    # as NoSuchBucket, which saves a round-trip on every run.
+    if keys is None:
+        keys = ["s3-test-file.txt"]
+    test_key = keys[0]
+
+    logger.info(f"\n1. Uploading {len(keys)} object(s) starting with '{test_key}'...")
+    try:
+        body_md5 = _content_md5(body)
+        _batch(lambda key: _upload(s3, ops, key, body, body_md5), keys)
+        logger.info(f"   SUCCESS: {len(keys)} object(s) uploaded!")
+    except ClientError as e:
+        if e.response['Error']['Code'] in ('404', 'NoSuchBucket'):
+            logger.warning(f"   WARNING: Bucket '{bucket_name}' does not exist")
+        else:
+            logger.error(f"   ERROR: Failed to upload object: {e}")
+        return False
+    except BotoCoreError as e:
+        logger.error(f"   ERROR: Failed to upload object: {e}")
+        return False
+
+    # Test 2: List objects
+    # This only shows that the upload succeeded, so restrict the listing to the
+    # uploaded keys' common prefix and the first LIST_MAX_ITEMS matches. No
+    # Delimiter is set so the server returns a flat listing.
+    logger.info(f"\n2. Listing uploaded objects in bucket...")
+    try:
+        object_count = 0
+        for page in ops.paginate(
+            Prefix=os.path.commonprefix(keys),
+            PaginationConfig={'MaxItems': LIST_MAX_ITEMS, 'PageSize': LIST_MAX_ITEMS}
+        ):
+            for obj in page.get('Contents', ()):
+                object_count += 1
+                logger.info(f"     - {obj['Key']} ({obj['Size']} bytes)")
+        if object_count:
+            logger.info(f"   SUCCESS: Found {object_count} object(s)")
+        else:
+            logger.info("   No objects found in bucket")
+    except (BotoCoreError, ClientError) as e:
+        logger.error(f"   ERROR: Failed to list objects: {e}")
+        return False
+
+    # Test 3: Download the object
+    logger.info(f"\n3. Downloading object '{test_key}'...")
+    try:
+        downloaded = _DigestWriter()
+        if len(body) < MULTIPART_THRESHOLD:
+            # download_fileobj issues a HeadObject to size the transfer first;
+            # a small object comes back in one GET, streamed in chunks
+            for chunk in ops.get(Key=test_key)['Body'].iter_chunks(CHUNK_SIZE):
+                downloaded.write(chunk)
+        else:
+            s3.download_fileobj(bucket_name, test_key, downloaded, Config=_transfer_config())
+        logger.info(f"   Downloaded {downloaded.size} bytes (SHA-256 {downloaded.sha256.hexdigest()})")
+
+        if downloaded.sha256.digest() == hashlib.sha256(body).digest():
+            logger.info("   SUCCESS: Downloaded content matches uploaded content!")
+        else:
+            logger.error("   ERROR: Content mismatch!")
+            return False
+    except (BotoCoreError, ClientError) as e:
+        logger.error(f"   ERROR: Failed to download object: {e}")
+        return False
+
+    # Test 4: Get object metadata
+    logger.info(f"\n4. Getting object metadata...")
+    try:
+        response = ops.head(Key=test_key)
+        logger.info(f"   Content-Length: {response['ContentLength']} bytes")
+        logger.info(f"   Content-Type: {response['ContentType']}")
+        logger.info(f"   Last-Modified: {response['LastModified']}")
+        logger.info(f"   ETag: {response['ETag']}")
+        logger.info("   SUCCESS: Retrieved object metadata!")
+    except (BotoCoreError, ClientError) as e:
+        logger.error(f"   ERROR: Failed to get object metadata: {e}")
+        return False
+
+    # Test 5: Delete the objects
+    logger.info(f"\n5. Deleting {len(keys)} object(s)...")
+    try:
+        errors = bulk_delete(ops.delete_objects, keys)
+        if errors:
+            logger.error(f"   ERROR: Failed to delete objects: {errors}")
+            return False
+        logger.info(f"   SUCCESS: {len(keys)} object(s) deleted!")
+    except (BotoCoreError, ClientError) as e:
+        logger.error(f"   ERROR: Failed to delete object: {e}")
+        return False
+
+    # Test 6: Verify deletion with one HEAD request per key instead of listing the bucket
+    logger.info(f"\n6. Verifying object deletion...")
+    try:
+        still_present = [key for key, exists in zip(keys, _batch(
+            lambda key: _object_exists(ops.head, key), keys)) if exists]
+        if still_present:
+            logger.error(f"   ERROR: Objects {still_present} still exist after deletion!")
+            return False
+        logger.info("   SUCCESS: Objects successfully deleted!")
+    except (BotoCoreError, ClientError) as e:
+        logger.error(f"   ERROR: Failed to verify deletion: {e}")
+        return False
+
+    return True
+
+
+async def _object_exists_async(head, key):
+    """
+    Async counterpart of _object_exists for the aioboto3 bucket-bound head_object.
+    """
+    try:
+        await head(Key=key)
+    except ClientError as e:
+        if e.response['Error']['Code'] in ('404', 'NoSuchKey'):
+            return False
+        raise
+    return True
+
+
+async def _read_digest(get, key):
+    """
+    Download an object with the bucket-bound get_object in CHUNK_SIZE pieces
+    and return the SHA-256 digest of its body.
+    """
+    sha256 = hashlib.sha256()
+    response = await get(Key=key)
+    # Iterate the StreamingBody itself: entering it as a context manager
+    # yields the underlying aiohttp response, which has no iter_chunks
+    body = response['Body']
+    try:
+        async for chunk in body.iter_chunks(CHUNK_SIZE):
+            sha256.update(chunk)
+    finally:
+        body.close()
+    return sha256.digest()
+
+
+async def _gather_all(semaphore, coros):
+    """
+    Run coros concurrently, at most as many at a time as semaphore allows,
+    and return their results in order.
+
+    Every coroutine is run to completion before the first exception (if any)
+    is re-raised, so nothing is left running against the client when the
+    caller leaves its async context.
+    """
+    async def limited(coro):
+        async with semaphore:
+            return await coro
+
+    results = await asyncio.gather(*[limited(coro) for coro in coros], return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+
+async def run_batch(endpoint, access_key, secret_key, bucket_name, keys,
+                    region='us-east-1', use_ssl=True, body=TEST_BODY):
+    """
+    Test S3 operations on many keys concurrently using aioboto3.
+
+    Every step issues its requests for all keys concurrently, bounded by the
+    client's max_pool_connections, so the wall time of a step is roughly one
+    round-trip per pool-sized wave instead of one round-trip per key.
+    Returns True if every step succeeded.
+    """
+    import aioboto3
+    from aiobotocore.config import AioConfig
+
+    body_md5 = _content_md5(body)
+
+    logger.info(f"\n{'='*60}")
+    logger.info(f"Testing Concurrent S3 Operations ({len(keys)} objects)")
+    logger.info(f"{'='*60}")
+
+    session = aioboto3.Session()
+    async with session.client(
+        's3',
+        endpoint_url=endpoint,
+        aws_access_key_id=access_key,
+        aws_secret_access_key=secret_key,
+        region_name=region,
+        use_ssl=use_ssl,
+        config=AioConfig(**CLIENT_CONFIG),
+        verify=False  # Skip SSL verification for self-signed certs
+    ) as s3:
+        ops = bind_bucket_operations(s3, bucket_name)
+        semaphore = asyncio.Semaphore(CLIENT_CONFIG['max_pool_connections'])
+
+        # Open a pooled connection before issuing the concurrent requests
+        try:
+            await s3.list_buckets()
+        except (BotoCoreError, ClientError):
+            pass
+
+        # Batch 1: Upload all objects
+        logger.info(f"\n1. Uploading {len(keys)} objects concurrently...")
+        try:
+            await _gather_all(semaphore, [
+                ops.put(
+                    Key=key,
+                    Body=body,
+                    ContentMD5=body_md5
+                ) for key in keys
+            ])
+            logger.info(f"   SUCCESS: {len(keys)} objects uploaded!")
+        except (BotoCoreError, ClientError) as e:
+            logger.error(f"   ERROR: Failed to upload objects: {e}")
+            return False
+
+        # Batch 2: Get metadata for all objects
+        logger.info(f"\n2. Getting metadata for {len(keys)} objects concurrently...")
+        try:
+            responses = await _gather_all(semaphore, [
+                ops.head(Key=key) for key in keys
+            ])
+            wrong_size = [key for key, response in zip(keys, responses)
+                          if response['ContentLength'] != len(body)]
+            if wrong_size:
+                logger.error(f"   ERROR: Unexpected Content-Length for {wrong_size}")
+                return False
+            logger.info("   SUCCESS: Retrieved metadata for all objects!")
+        except (BotoCoreError, ClientError) as e:
+            logger.error(f"   ERROR: Failed to get object metadata: {e}")
+            return False
+
+        # Batch 3: Download and verify all objects
+        logger.info(f"\n3. Downloading {len(keys)} objects concurrently...")
+        try:
+            expected = hashlib.sha256(body).digest()
+            digests = await _gather_all(semaphore, [
+                _read_digest(ops.get, key) for key in keys
+            ])
+            mismatched = [key for key, digest in zip(keys, digests) if digest != expected]
+            if mismatched:
+                logger.error(f"   ERROR: Content mismatch for {mismatched}")
+                return False
+            logger.info("   SUCCESS: Downloaded content matches for all objects!")
+        except (BotoCoreError, ClientError) as e:
+            logger.error(f"   ERROR: Failed to download objects: {e}")
+            return False
+
+        # Batch 4: Delete all objects
+        logger.info(f"\n4. Deleting {len(keys)} objects in bulk...")
+        try:
+            responses = await _gather_all(semaphore, [
+                ops.delete_objects(Delete=delete) for delete in _delete_batches(keys)
+            ])
+            errors = [error for response in responses for error in response.get('Errors', [])]
+            if errors:
+                logger.error(f"   ERROR: Failed to delete objects: {errors}")
+                return False
+            logger.info(f"   SUCCESS: {len(keys)} objects deleted!")
+        except (BotoCoreError, ClientError) as e:
+            logger.error(f"   ERROR: Failed to delete objects: {e}")
+            return False
+
+        # Batch 5: Verify deletion
+        logger.info(f"\n5. Verifying deletion of {len(keys)} objects...")
+        try:
+            still_present = [key for key, exists in zip(keys, await _gather_all(semaphore, [
+                _object_exists_async(ops.head, key) for key in keys
+            ])) if exists]
+            if still_present:
+                logger.error(f"   ERROR: Objects still exist after deletion: {still_present}")
+                return False
+            logger.info("   SUCCESS: All objects successfully deleted!")
+        except (BotoCoreError, ClientError) as e:
+            logger.error(f"   ERROR: Failed to verify deletion: {e}")
+            return False
+
+    return True